@@ -0,0 +1,109 @@
+import os
+import sqlite3
+from urllib.parse import quote
+from contextlib import contextmanager
+from functools import lru_cache
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import QueuePool
+
+DEFAULT_DB_URL = 'sqlite:///workforce_alpha/data/db/quant.db'
+
+# Overrides DEFAULT_DB_URL; --db URL on the command line overrides both
+DB_URL_ENV = 'WSI_DB_URL'
+
+# Applied to every new SQLite connection
+SQLITE_PRAGMAS = {
+    'mmap_size': 268435456,   # 256 MB memory-mapped reads
+    'cache_size': -64000,     # 64 MB page cache (negative = KiB)
+    'temp_store': 'MEMORY',
+}
+
+_db_url = None
+
+
+def set_db_url(url):
+    global _db_url
+    _db_url = url
+
+
+def get_db_url():
+    return _db_url or os.environ.get(DB_URL_ENV, DEFAULT_DB_URL)
+
+
+def parse_db_args(argv):
+    """Strip --db URL from argv, apply it, and return the remaining arguments."""
+    argv = list(argv)
+    if '--db' in argv:
+        i = argv.index('--db')
+        if i + 1 >= len(argv):
+            raise SystemExit("Usage: --db URL (e.g. --db sqlite:///path/to/quant.db)")
+        set_db_url(argv[i + 1])
+        del argv[i:i + 2]
+    return argv
+
+
+def _is_file_sqlite(url):
+    return url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:')
+
+
+@lru_cache(maxsize=None)
+def _build_engine(db_url, read_only):
+    url = make_url(db_url)
+
+    if not _is_file_sqlite(url):
+        if read_only:
+            raise ValueError(f"Read-only mode is only supported for file-backed SQLite, not {url.render_as_string()}")
+        return create_engine(url)
+
+    if read_only:
+        # Open the file itself read-only so readers can never take a write lock
+        # Connect via sqlite3 directly: SQLAlchemy would unquote an escaped URI path
+        uri = f"file:{quote(os.path.abspath(url.database))}?mode=ro"
+        engine = create_engine('sqlite://', poolclass=QueuePool,
+                               creator=lambda: sqlite3.connect(uri, uri=True, timeout=30,
+                                                               check_same_thread=False))
+    else:
+        os.makedirs(os.path.dirname(os.path.abspath(url.database)), exist_ok=True)
+        engine = create_engine(url, connect_args={'timeout': 30})
+
+    @event.listens_for(engine, 'connect')
+    def _set_pragmas(dbapi_conn, _):
+        cursor = dbapi_conn.cursor()
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        else:
+            # WAL lets readers run alongside the nightly writer; it persists in the file
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    return engine
+
+
+def get_engine(read_only=False):
+    """Cached engine for the configured DB URL; one per (url, read_only) pair.
+
+    Pragmas and read-only mode apply to file-backed SQLite only. Other backends
+    and in-memory SQLite get a plain engine, and read_only=True raises
+    ValueError for them rather than silently handing out a writable engine.
+    """
+    return _build_engine(get_db_url(), read_only)
+
+
+@contextmanager
+def session_scope(read_only=False):
+    """Session that commits on success, rolls back on error and is always closed."""
+    session = Session(get_engine(read_only=read_only))
+    try:
+        yield session
+        if not read_only:
+            session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
@@ -0,0 +1,128 @@
+import os
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import pandas as pd
+
+# Columns every provider must return, indexed by date
+PRICE_COLUMNS = ['Close', 'Adj Close', 'Volume']
+
+
+class MarketDataProvider(ABC):
+    """Source of daily price bars. fetch() returns {ticker: DataFrame}.
+
+    Tickers that are missing from the result or come back empty are treated
+    as failures by the fetcher and retried. chunk_size and max_workers are the
+    fetcher defaults suited to the provider.
+    """
+
+    chunk_size = 50
+    max_workers = 4
+
+    @abstractmethod
+    def fetch(self, tickers, start, end):
+        pass
+
+
+class YahooProvider(MarketDataProvider):
+    # One request per ticker, so keep chunks small and run many of them at once
+    chunk_size = 10
+    max_workers = 16
+
+    def fetch(self, tickers, start, end):
+        import yfinance as yf
+
+        # Per-ticker history() instead of yf.download, which keeps its results in
+        # module-level state that concurrent calls overwrite
+        frames = {}
+        for ticker in tickers:
+            try:
+                df = yf.Ticker(ticker).history(start=start, end=end, auto_adjust=False)
+            except Exception:
+                # Left out of the result; the fetcher retries missing tickers
+                continue
+            if df.empty or not set(PRICE_COLUMNS).issubset(df.columns):
+                continue
+            if df.index.tz is not None:
+                df.index = df.index.tz_localize(None)
+            frames[ticker] = df[PRICE_COLUMNS].dropna()
+        return frames
+
+
+class LocalFileProvider(MarketDataProvider):
+    """Reads <directory>/<TICKER>.csv with Date, Close, Adj Close, Volume columns.
+
+    Used for tests and offline runs; tickers without a file are left out of the result.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def fetch(self, tickers, start, end):
+        frames = {}
+        for ticker in tickers:
+            path = os.path.join(self.directory, f"{ticker}.csv")
+            if not os.path.exists(path):
+                continue
+            df = pd.read_csv(path, parse_dates=['Date'], index_col='Date')
+            df = df.loc[(df.index >= pd.Timestamp(start)) & (df.index < pd.Timestamp(end))]
+            frames[ticker] = df[PRICE_COLUMNS].dropna()
+        return frames
+
+
+def _fetch_with_retry(provider, chunk, start, end, max_retries, backoff):
+    frames = {}
+    remaining = list(chunk)
+    for attempt in range(max_retries + 1):
+        try:
+            fetched = provider.fetch(remaining, start, end)
+            error = "no data returned"
+        except Exception as e:
+            fetched = {}
+            error = e
+
+        # Missing or empty tickers count as failures and are retried on their own
+        frames.update({t: df for t, df in fetched.items() if df is not None and not df.empty})
+        remaining = [t for t in remaining if t not in frames]
+        if not remaining:
+            break
+
+        if attempt == max_retries:
+            print(f"Warning: giving up on {', '.join(remaining)} after {attempt + 1} attempts: {error}")
+            break
+        delay = backoff * (2 ** attempt)
+        print(f"Fetch failed for {', '.join(remaining)} ({error}), retrying in {delay:.1f}s...")
+        time.sleep(delay)
+
+    return frames
+
+
+def fetch_in_chunks(provider, tickers, start, end, chunk_size=None, max_workers=None,
+                    max_retries=3, backoff=1.0):
+    """Yield {ticker: DataFrame} per chunk as soon as each chunk arrives.
+
+    At most max_workers chunks are in flight at once, so memory stays bounded
+    regardless of universe size. Tickers that keep failing are reported and skipped.
+    chunk_size and max_workers default to the provider's own settings.
+    """
+    chunk_size = chunk_size or provider.chunk_size
+    max_workers = max_workers or provider.max_workers
+    tickers = list(tickers)
+    chunks = iter([tickers[i:i + chunk_size] for i in range(0, len(tickers), chunk_size)])
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        def submit_next():
+            chunk = next(chunks, None)
+            if chunk is not None:
+                pending.add(pool.submit(_fetch_with_retry, provider, chunk, start, end,
+                                        max_retries, backoff))
+
+        pending = set()
+        for _ in range(max_workers):
+            submit_next()
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                submit_next()
+                yield future.result()
@@ -1,106 +1,120 @@
 import pandas as pd
-import yfinance as yf
-from sqlalchemy import create_engine, select
-from sqlalchemy.orm import Session
+from sqlalchemy import select
 from datetime import datetime
 import sys
 import os
 from .models import Company, MarketData, EmployeeEvent, EventType, Base
+from .fetcher import YahooProvider, LocalFileProvider, fetch_in_chunks
+from .db import session_scope, parse_db_args
 
-DB_PATH = 'sqlite:///workforce_alpha/data/db/quant.db'
-
-def ingest_market_data(tickers):
-    engine = create_engine(DB_PATH)
-    session = Session(engine)
-    
-    print(f"Fetching market data for {tickers}...")
-    
-    # Download data
-    data = yf.download(tickers, start="2020-01-01", end=datetime.now().strftime('%Y-%m-%d'), group_by='ticker')
-    
-    for ticker in tickers:
+def save_market_chunk(session, frames):
+    for ticker, df in frames.items():
         # Get or create company
         company = session.query(Company).filter_by(ticker=ticker).first()
         if not company:
             print(f"Creating company {ticker}...")
             company = Company(ticker=ticker, sector="Unknown", industry="Unknown")
             session.add(company)
-            session.commit()
-            
-        # Extract ticker data
-        if len(tickers) > 1:
-            df = data[ticker].copy()
-        else:
-            df = data.copy()
-            
-        df = df.dropna()
-        
-        print(f"Saving {len(df)} records for {ticker}...")
-        
-        # Bulk insert
-        market_entries = []
-        for index, row in df.iterrows():
-            # Check if exists
-            exists = session.query(MarketData).filter_by(company_id=company.id, date=index.date()).first()
-            if not exists:
-                market_entries.append(MarketData(
-                    company_id=company.id,
-                    date=index.date(),
-                    close=row['Close'],
-                    adjusted_close=row['Adj Close'],
-                    volume=row['Volume']
-                ))
-        
+            session.flush()
+
+        # Load existing dates once instead of querying per row
+        existing = {d for (d,) in session.query(MarketData.date).filter_by(company_id=company.id)}
+
+        market_entries = [
+            MarketData(
+                company_id=company.id,
+                date=index.date(),
+                close=row['Close'],
+                adjusted_close=row['Adj Close'],
+                volume=row['Volume']
+            )
+            for index, row in df.iterrows()
+            if index.date() not in existing
+        ]
+
+        print(f"Saving {len(market_entries)} new records for {ticker}...")
         if market_entries:
             session.bulk_save_objects(market_entries)
-            session.commit()
-            
+
+    session.commit()
+
+def ingest_market_data(tickers, provider=None, chunk_size=None, max_workers=None):
+    if provider is None:
+        provider = YahooProvider()
+
+    print(f"Fetching market data for {len(tickers)} tickers...")
+
+    # Chunks are written as they arrive so the full universe is never held in memory
+    start = "2020-01-01"
+    end = datetime.now().strftime('%Y-%m-%d')
+    with session_scope() as session:
+        for frames in fetch_in_chunks(provider, tickers, start, end,
+                                      chunk_size=chunk_size, max_workers=max_workers):
+            save_market_chunk(session, frames)
+
     print("Market data ingestion complete.")
 
 def ingest_employee_events(csv_path):
-    engine = create_engine(DB_PATH)
-    session = Session(engine)
-    
-    print(f"Loading employee events from {csv_path}...")
-    df = pd.read_csv(csv_path)
-    
-    # Expected CSV columns: ticker, event_date, event_type, seniority, metadata
-    
-    for _, row in df.iterrows():
-        ticker = row['ticker']
-        company = session.query(Company).filter_by(ticker=ticker).first()
-        if not company:
-            print(f"Warning: Company {ticker} not found. Skipping.")
-            continue
-            
-        # Create Event
-        # Note: In a real system, we'd map to specific employees. 
-        # Here we might create dummy employees if ID not provided.
-        
-        event = EmployeeEvent(
-            # employee_id=... # We need an employee. 
-            # For simplicity in this ingestion, we'll create a dummy employee or look up if provided.
-            # Let's assume CSV has employee_hash
-            event_date=pd.to_datetime(row['event_date']).date(),
-            event_type=EventType[row['event_type']], # Assumes matches Enum
-            metadata_json=row.get('metadata', {})
-        )
-        
-        # Handle Employee
-        # This part depends heavily on the CSV format. 
-        # For now, we'll just print a placeholder as we don't have the CSV spec from the user yet.
-        pass
-        
-    print("Employee event ingestion logic placeholder.")
+    with session_scope() as session:
+        print(f"Loading employee events from {csv_path}...")
+        df = pd.read_csv(csv_path)
+
+        # Expected CSV columns: ticker, event_date, event_type, seniority, metadata
+
+        for _, row in df.iterrows():
+            ticker = row['ticker']
+            company = session.query(Company).filter_by(ticker=ticker).first()
+            if not company:
+                print(f"Warning: Company {ticker} not found. Skipping.")
+                continue
+
+            # Create Event
+            # Note: In a real system, we'd map to specific employees. 
+            # Here we might create dummy employees if ID not provided.
+
+            event = EmployeeEvent(
+                # employee_id=... # We need an employee. 
+                # For simplicity in this ingestion, we'll create a dummy employee or look up if provided.
+                # Let's assume CSV has employee_hash
+                event_date=pd.to_datetime(row['event_date']).date(),
+                event_type=EventType[row['event_type']], # Assumes matches Enum
+                metadata_json=row.get('metadata', {})
+            )
+
+            # Handle Employee
+            # This part depends heavily on the CSV format. 
+            # For now, we'll just print a placeholder as we don't have the CSV spec from the user yet.
+            pass
+
+        print("Employee event ingestion logic placeholder.")
+
+def pop_int_arg(argv, flag):
+    """Remove `flag N` from argv in place and return N, or None if absent."""
+    if flag not in argv:
+        return None
+    i = argv.index(flag)
+    if i + 1 >= len(argv) or not argv[i + 1].isdigit():
+        raise SystemExit(f"Usage: {flag} N")
+    value = int(argv[i + 1])
+    del argv[i:i + 2]
+    return value
 
 if __name__ == "__main__":
-    if len(sys.argv) > 1:
-        command = sys.argv[1]
+    argv = parse_db_args(sys.argv)
+    chunk_size = pop_int_arg(argv, "--chunk-size")
+    max_workers = pop_int_arg(argv, "--max-workers")
+    if len(argv) > 1:
+        command = argv[1]
         if command == "market":
-            tickers = sys.argv[2:]
-            ingest_market_data(tickers)
+            tickers = argv[2:]
+            ingest_market_data(tickers, chunk_size=chunk_size, max_workers=max_workers)
+        elif command == "market-local":
+            directory = argv[2]
+            tickers = argv[3:]
+            ingest_market_data(tickers, provider=LocalFileProvider(directory),
+                               chunk_size=chunk_size, max_workers=max_workers)
         elif command == "events":
-            csv_path = sys.argv[2]
+            csv_path = argv[2]
             ingest_employee_events(csv_path)
     else:
-        print("Usage: python -m src.ingest [market TICKER1 TICKER2 | events CSV_PATH]")
+        print("Usage: python -m src.ingest [--db URL] [--chunk-size N] [--max-workers N] [market TICKER1 TICKER2 | market-local DIR TICKER1 TICKER2 | events CSV_PATH]")
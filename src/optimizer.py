@@ -1,38 +1,63 @@
+import sys
 import pandas as pd
 import numpy as np
-from .backtester import load_data, run_strategy
+from .backtester import load_data, COST_BPS
+from .portfolio import build_portfolio, cost_sweep, pivot_panel
+from .reporting import write_sweep_heatmap, INCLUDE_PLOTLYJS
+from .db import parse_db_args
 
-def optimize():
+REPORT_PATH = "workforce_alpha/optimizer_results.html"
+
+def optimize(report_path=REPORT_PATH, include_plotlyjs=INCLUDE_PLOTLYJS):
     df = load_data()
-    
+
     quantiles = [0.1, 0.2, 0.3, 0.4, 0.5]
     smoothings = [1, 3, 5, 10]
-    
+    rebalances = ['daily', 'weekly', 'monthly']
+    # Always include the backtester's base cost, which parameters are ranked at
+    costs_bps = sorted({0.0, 5.0, 20.0, 50.0, COST_BPS})
+
     results = []
-    
-    print(f"Running optimization on {len(quantiles) * len(smoothings)} combinations...")
-    
-    for q in quantiles:
-        for s in smoothings:
-            res = run_strategy(df, quantile=q, smoothing=s)
-            results.append({
-                'quantile': q,
-                'smoothing': s,
-                'sharpe': res['sharpe'],
-                'return': res['return'],
-                'volatility': res['volatility'],
-                'max_drawdown': res['max_drawdown']
-            })
-            print(f"Q: {q:.1f}, S: {s} -> Sharpe: {res['sharpe']:.2f}, Ret: {res['return']:.2%}")
-            
-    results_df = pd.DataFrame(results)
-    best_sharpe = results_df.loc[results_df['sharpe'].idxmax()]
-    
+
+    print(f"Running optimization on {len(quantiles) * len(smoothings) * len(rebalances)} combinations "
+          f"x {len(costs_bps)} cost assumptions...")
+
+    for s in smoothings:
+        # The pivot only depends on smoothing
+        panel = pivot_panel(df, smoothing=s)
+        for q in quantiles:
+            for rb in rebalances:
+                # Weights and turnover are built once; each cost level is a cheap array op
+                portfolio = build_portfolio(df, quantile=q, smoothing=s, rebalance=rb, panel=panel)
+                sweep = cost_sweep(portfolio, costs_bps)
+                sweep['quantile'] = q
+                sweep['smoothing'] = s
+                sweep['rebalance'] = rb
+                results.append(sweep)
+
+                base = sweep[sweep['cost_bps'] == COST_BPS].iloc[0]
+                print(f"Q: {q:.1f}, S: {s}, R: {rb} -> Sharpe @ {COST_BPS:g}bps: {base['sharpe']:.2f}, "
+                      f"Ret: {base['return']:.2%}, Turnover: {base['turnover']:.2%}")
+
+    results_df = pd.concat(results, ignore_index=True)
+    results_df = results_df[['quantile', 'smoothing', 'rebalance', 'cost_bps', 'sharpe',
+                             'return', 'volatility', 'max_drawdown', 'turnover']]
+
+    # Rank parameters at the base cost assumption; zero cost always wins otherwise
+    base_df = results_df[results_df['cost_bps'] == COST_BPS]
+    best_sharpe = base_df.loc[base_df['sharpe'].idxmax()]
+
     print("\nOptimization Complete.")
-    print("Best Parameters (by Sharpe):")
+    print(f"Best Parameters (by Sharpe @ {COST_BPS:g} bps):")
     print(best_sharpe)
-    
+
+    if report_path:
+        write_sweep_heatmap(results_df, report_path, metric='sharpe', cost_bps=COST_BPS,
+                            include_plotlyjs=include_plotlyjs)
+
     return best_sharpe
 
 if __name__ == "__main__":
-    optimize()
+    parse_db_args(sys.argv)
+    optimize(report_path=None if "--no-plot" in sys.argv else REPORT_PATH,
+             include_plotlyjs=True if "--embed-plotlyjs" in sys.argv else INCLUDE_PLOTLYJS)
@@ -0,0 +1,183 @@
+import pandas as pd
+import numpy as np
+
+ANNUAL_FACTOR = 252
+
+# Period used to pick the first trading day of each rebalance window
+REBALANCE_PERIODS = {'daily': None, 'weekly': 'W', 'monthly': 'M'}
+
+
+def pivot_panel(df, smoothing=1, adv_window=20):
+    """Reshape the merged factor/market frame into dates x companies matrices.
+
+    Returns, smoothing, lags and ADV are computed per company over its own rows
+    before pivoting, so a missing date bridges to the next one instead of
+    blanking the surrounding days.
+    """
+    if df.empty:
+        empty = pd.DataFrame(index=pd.DatetimeIndex([], name='date'), columns=pd.Index([], name='company_id'),
+                             dtype=float)
+        return {'returns': empty, 'signal': empty.copy(), 'dollar_adv': empty.copy(),
+                'smoothing': smoothing, 'adv_window': adv_window}
+
+    df = df.drop_duplicates(['company_id', 'date'], keep='last').sort_values(['company_id', 'date'])
+    by_company = df.groupby('company_id')
+
+    df = df.assign(
+        ret=by_company['close'].pct_change(fill_method=None),
+        dollar_volume=df['volume'] * df['close'],
+    )
+    by_company = df.groupby('company_id')
+
+    if smoothing > 1:
+        wsi = by_company['wsi_composite'].rolling(window=smoothing).mean().reset_index(level=0, drop=True)
+        df = df.assign(wsi_composite=wsi)
+        by_company = df.groupby('company_id')
+
+    # Shift Signal: We use WSI from T to trade at T+1
+    df = df.assign(
+        signal=by_company['wsi_composite'].shift(1),
+        # Trailing average dollar volume known before the open
+        dollar_adv=by_company['dollar_volume'].rolling(adv_window, min_periods=1).mean()
+            .reset_index(level=0, drop=True).groupby(df['company_id']).shift(1),
+    )
+
+    wide = df.pivot(index='date', columns='company_id', values=['ret', 'signal', 'dollar_adv'])
+    returns, signal = wide['ret'], wide['signal']
+
+    # Only names with both a signal and a return are tradeable on a given day
+    tradeable = signal.notna() & returns.notna()
+    signal = signal.where(tradeable)
+
+    # Need at least one long and one short
+    keep = tradeable.sum(axis=1) >= 2
+    return {
+        'returns': returns[keep],
+        'signal': signal[keep],
+        'dollar_adv': wide['dollar_adv'][keep],
+        'smoothing': smoothing,
+        'adv_window': adv_window,
+    }
+
+
+def target_weights(signal, quantile):
+    """Equal-weight long the lowest-WSI quantile and short the highest, 50/50 gross."""
+    n = signal.notna().sum(axis=1).to_numpy()[:, None]
+    k = np.maximum(1, (n * quantile).astype(int))
+
+    # method='first' matches picking the first k rows of a sorted frame
+    ranks = signal.rank(axis=1, method='first').to_numpy()
+    longs = ranks <= k
+    shorts = ranks > n - k
+
+    weights = np.where(longs, 0.5 / k, 0.0) - np.where(shorts, 0.5 / k, 0.0)
+    return pd.DataFrame(weights, index=signal.index, columns=signal.columns)
+
+
+def build_portfolio(df, quantile=0.3, smoothing=1, rebalance='daily', max_weight=None,
+                    max_participation=None, capital=1e7, adv_window=20, panel=None):
+    """Build held weights from lagged WSI ranks and compute gross returns and turnover.
+
+    Targets are only traded on the first trading day of each rebalance window;
+    in between, positions drift with their returns. Turnover is the trade from
+    the drifted book back to target. max_weight caps each absolute position;
+    max_participation caps a position at that fraction of the trailing average
+    dollar volume (lagged one day) relative to capital. Trimmed weight is left
+    in cash. A precomputed pivot_panel() can be passed to skip the pivot; it
+    must have been built with the same smoothing and adv_window.
+    """
+    if rebalance not in REBALANCE_PERIODS:
+        raise ValueError(f"Unknown rebalance frequency: {rebalance}")
+
+    if panel is None:
+        panel = pivot_panel(df, smoothing=smoothing, adv_window=adv_window)
+    elif (panel['smoothing'], panel['adv_window']) != (smoothing, adv_window):
+        raise ValueError(f"Panel built with smoothing={panel['smoothing']}, adv_window={panel['adv_window']}; "
+                         f"got smoothing={smoothing}, adv_window={adv_window}")
+    returns = panel['returns']
+    targets = target_weights(panel['signal'], quantile)
+
+    if max_weight is not None:
+        targets = targets.clip(-max_weight, max_weight)
+
+    if max_participation is not None:
+        limit = (max_participation * panel['dollar_adv'] / capital).fillna(0)
+        targets = np.sign(targets) * np.minimum(targets.abs(), limit)
+
+    freq = REBALANCE_PERIODS[rebalance]
+    if freq is None:
+        is_rebalance = np.ones(len(targets), dtype=bool)
+    else:
+        is_rebalance = ~pd.Series(targets.index.to_period(freq)).duplicated().to_numpy()
+
+    # A name without a return that day is unchanged; the next return bridges the gap
+    r = returns.fillna(0).to_numpy()
+    period = np.cumsum(is_rebalance) - 1
+    target = targets.to_numpy()[is_rebalance][period]
+
+    # Position values relative to NAV at the last rebalance, at the open and at the close
+    growth = pd.DataFrame(1 + r).groupby(period).cumprod()
+    open_growth = growth.groupby(period).shift(1, fill_value=1.0).to_numpy()
+    growth = growth.to_numpy()
+    open_value = target * open_growth
+    close_value = target * growth
+    open_nav = 1 + (open_value - target).sum(axis=1)
+    close_nav = 1 + (close_value - target).sum(axis=1)
+
+    held = open_value / open_nav[:, None]
+    drifted = close_value / close_nav[:, None]
+    gross = close_nav / open_nav - 1
+
+    # Trade from yesterday's drifted book to target on rebalance days only
+    prev_drifted = np.vstack([np.zeros((1, r.shape[1])), drifted[:-1]])
+    turnover = np.where(is_rebalance, np.abs(target - prev_drifted).sum(axis=1), 0.0)
+
+    market = returns.where(panel['signal'].notna()).mean(axis=1).to_numpy()
+
+    results_df = pd.DataFrame({
+        'gross': gross,
+        'turnover': turnover,
+        'market': market,
+    }, index=returns.index)
+    results_df.index.name = 'date'
+
+    weights = pd.DataFrame(held, index=targets.index, columns=targets.columns)
+    return {'weights': weights, 'df': results_df}
+
+
+def apply_costs(portfolio, cost_bps=0.0):
+    """Return a copy of the portfolio frame with cost drag and net strategy returns."""
+    results_df = portfolio['df'].copy()
+    results_df['cost'] = results_df['turnover'] * cost_bps / 1e4
+    results_df['strategy'] = results_df['gross'] - results_df['cost']
+    return results_df
+
+
+def cost_sweep(portfolio, cost_bps_list):
+    """Performance statistics for each cost assumption, computed in one array pass."""
+    results_df = portfolio['df']
+    costs = np.asarray(cost_bps_list, dtype=float)
+
+    # dates x costs matrix of net returns
+    net = results_df['gross'].to_numpy()[:, None] - results_df['turnover'].to_numpy()[:, None] * costs[None, :] / 1e4
+
+    if len(net) == 0:
+        zeros = np.zeros(len(costs))
+        return pd.DataFrame({'cost_bps': costs, 'sharpe': zeros, 'return': zeros,
+                             'volatility': zeros, 'max_drawdown': zeros, 'turnover': zeros})
+
+    mean = net.mean(axis=0) * ANNUAL_FACTOR
+    std = net.std(axis=0, ddof=1) * np.sqrt(ANNUAL_FACTOR) if len(net) > 1 else np.zeros(len(costs))
+    sharpe = np.divide(mean, std, out=np.zeros_like(mean), where=std != 0)
+
+    cum = np.cumprod(1 + net, axis=0)
+    peak = np.maximum.accumulate(cum, axis=0)
+
+    return pd.DataFrame({
+        'cost_bps': costs,
+        'sharpe': sharpe,
+        'return': cum[-1] - 1,
+        'volatility': std,
+        'max_drawdown': ((cum - peak) / peak).min(axis=0),
+        'turnover': np.full(len(costs), results_df['turnover'].mean()),
+    })
@@ -0,0 +1,139 @@
+import os
+import pandas as pd
+import numpy as np
+from .portfolio import ANNUAL_FACTOR
+
+# Series longer than this are downsampled before plotting
+MAX_POINTS = 2000
+ROLLING_WINDOW = 63
+
+# Load plotly.js from its CDN instead of embedding the ~4.5 MB bundle in every report;
+# pass True for reports that must open offline
+INCLUDE_PLOTLYJS = 'cdn'
+
+
+def lttb(x, y, threshold):
+    """Largest-Triangle-Three-Buckets: indices of threshold points preserving the series shape."""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    idx = np.empty(threshold, dtype=int)
+    idx[0] = 0
+    idx[-1] = n - 1
+
+    # First and last points are fixed; the rest is split into threshold - 2 buckets
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+
+        # Pick the point forming the largest triangle with the previous pick and the next bucket's mean
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        idx[i + 1] = a
+
+    return idx
+
+
+def downsample(series, max_points=MAX_POINTS):
+    """Downsample a date-indexed series with LTTB, dropping NaNs first."""
+    series = series.dropna()
+    if len(series) <= max_points:
+        return series
+
+    x = pd.DatetimeIndex(series.index).asi8
+    x = (x - x[0]) / 1e9
+    return series.iloc[lttb(x, series.to_numpy(), max_points)]
+
+
+def drawdown(returns):
+    cum = (1 + returns).cumprod()
+    return cum / cum.cummax() - 1
+
+
+def rolling_sharpe(returns, window=ROLLING_WINDOW):
+    rolling = returns.rolling(window)
+    std = rolling.std().replace(0, np.nan)
+    return rolling.mean() / std * np.sqrt(ANNUAL_FACTOR)
+
+
+def _write_html(fig, path, include_plotlyjs):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    fig.write_html(path, include_plotlyjs=include_plotlyjs)
+
+
+def write_backtest_report(results_df, path, max_points=MAX_POINTS, window=ROLLING_WINDOW,
+                          include_plotlyjs=INCLUDE_PLOTLYJS):
+    """Cumulative return, drawdown and rolling Sharpe panels for each return column."""
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    names = {'strategy': 'WSI Strategy (L/S)', 'market': 'Market (Eq Wgt)'}
+
+    fig = make_subplots(rows=3, cols=1, shared_xaxes=True, vertical_spacing=0.05,
+                        row_heights=[0.5, 0.25, 0.25],
+                        subplot_titles=('Cumulative Return', 'Drawdown', f'Rolling Sharpe ({window}D)'))
+
+    for col, name in names.items():
+        if col not in results_df:
+            continue
+        returns = results_df[col]
+        panels = [(1 + returns).cumprod(), drawdown(returns), rolling_sharpe(returns, window)]
+        for row, series in enumerate(panels, start=1):
+            series = downsample(series, max_points)
+            fig.add_trace(go.Scatter(x=series.index, y=series.to_numpy(), name=name,
+                                     legendgroup=col, showlegend=row == 1), row=row, col=1)
+
+    fig.update_layout(title='Workforce Stress Index Strategy Performance',
+                      template='plotly_dark', height=900)
+    fig.update_xaxes(title_text='Date', row=3, col=1)
+
+    _write_html(fig, path, include_plotlyjs)
+    print(f"Plot saved to {path}")
+
+
+def write_sweep_heatmap(results_df, path, metric='sharpe', cost_bps=None,
+                        include_plotlyjs=INCLUDE_PLOTLYJS):
+    """Quantile x smoothing heatmap of an optimizer metric, one panel per rebalance frequency."""
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    df = results_df
+    if cost_bps is not None:
+        df = df[df['cost_bps'] == cost_bps]
+        if df.empty:
+            raise ValueError(f"No sweep results at cost_bps={cost_bps:g}; "
+                             f"available: {sorted(results_df['cost_bps'].unique())}")
+    if df.empty:
+        raise ValueError("No sweep results to plot")
+
+    rebalances = list(df['rebalance'].unique()) if 'rebalance' in df else [None]
+
+    fig = make_subplots(rows=1, cols=len(rebalances), shared_yaxes=True,
+                        subplot_titles=[str(rb) for rb in rebalances] if rebalances != [None] else None)
+
+    for i, rb in enumerate(rebalances, start=1):
+        sub = df if rb is None else df[df['rebalance'] == rb]
+        grid = sub.pivot_table(index='quantile', columns='smoothing', values=metric, aggfunc='mean')
+        fig.add_trace(go.Heatmap(z=grid.to_numpy(), x=[str(c) for c in grid.columns],
+                                 y=[str(q) for q in grid.index], coloraxis='coloraxis'),
+                      row=1, col=i)
+        fig.update_xaxes(title_text='Smoothing', row=1, col=i)
+
+    title = f'Optimizer Sweep: {metric}'
+    if cost_bps is not None:
+        title += f' @ {cost_bps:g} bps'
+    fig.update_layout(title=title, template='plotly_dark', coloraxis={'colorscale': 'RdYlGn'})
+    fig.update_yaxes(title_text='Quantile', row=1, col=1)
+
+    _write_html(fig, path, include_plotlyjs)
+    print(f"Heatmap saved to {path}")
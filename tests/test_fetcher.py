@@ -0,0 +1,137 @@
+import sys
+import types
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from src.fetcher import MarketDataProvider, LocalFileProvider, YahooProvider, fetch_in_chunks
+from src.ingest import save_market_chunk
+from src.models import Base, Company, MarketData
+
+START, END = "2021-01-01", "2021-03-01"
+
+
+def write_fixture(directory, ticker, periods=20):
+    dates = pd.bdate_range(START, periods=periods)
+    prices = np.arange(periods, dtype=float) + 1
+    pd.DataFrame({'Date': dates, 'Close': prices, 'Adj Close': prices, 'Volume': 1000.0}) \
+        .to_csv(directory / f"{ticker}.csv", index=False)
+
+
+class FlakyProvider(MarketDataProvider):
+    def __init__(self, inner, failures):
+        self.inner = inner
+        self.failures = failures
+        self.calls = 0
+
+    def fetch(self, tickers, start, end):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionError("rate limited")
+        return self.inner.fetch(tickers, start, end)
+
+
+class BrokenProvider(MarketDataProvider):
+    def __init__(self):
+        self.calls = 0
+
+    def fetch(self, tickers, start, end):
+        self.calls += 1
+        raise ConnectionError("down")
+
+
+@pytest.fixture
+def fixture_dir(tmp_path):
+    for ticker in ['AAA', 'BBB', 'CCC', 'DDD', 'EEE']:
+        write_fixture(tmp_path, ticker)
+    return tmp_path
+
+
+def test_fetch_in_chunks_splits_and_yields_every_ticker(fixture_dir):
+    tickers = ['AAA', 'BBB', 'CCC', 'DDD', 'EEE']
+    chunks = list(fetch_in_chunks(LocalFileProvider(fixture_dir), tickers, START, END,
+                                  chunk_size=2, max_workers=2, backoff=0))
+
+    assert sorted(len(c) for c in chunks) == [1, 2, 2]
+    frames = {t: df for c in chunks for t, df in c.items()}
+    assert sorted(frames) == tickers
+    assert list(frames['AAA'].columns) == ['Close', 'Adj Close', 'Volume']
+    assert len(frames['AAA']) == 20
+
+
+def test_missing_tickers_are_skipped_and_reported(fixture_dir, capsys):
+    chunks = list(fetch_in_chunks(LocalFileProvider(fixture_dir), ['AAA', 'ZZZ'], START, END,
+                                  max_retries=1, backoff=0))
+
+    assert sorted(t for c in chunks for t in c) == ['AAA']
+    assert "giving up on ZZZ" in capsys.readouterr().out
+
+
+def test_flaky_provider_is_retried(fixture_dir):
+    provider = FlakyProvider(LocalFileProvider(fixture_dir), failures=2)
+    chunks = list(fetch_in_chunks(provider, ['AAA', 'BBB'], START, END, max_retries=3, backoff=0))
+
+    assert sorted(t for c in chunks for t in c) == ['AAA', 'BBB']
+    assert provider.calls == 3
+
+
+def test_failing_provider_gives_up():
+    provider = BrokenProvider()
+    chunks = list(fetch_in_chunks(provider, ['AAA', 'BBB', 'CCC'], START, END,
+                                  chunk_size=2, max_workers=1, max_retries=2, backoff=0))
+
+    assert chunks == [{}, {}]
+    assert provider.calls == 6
+
+
+def test_incomplete_provider_fails_at_construction():
+    class NoFetch(MarketDataProvider):
+        pass
+
+    with pytest.raises(TypeError):
+        NoFetch()
+
+
+def test_chunking_defaults_come_from_provider(fixture_dir):
+    provider = LocalFileProvider(fixture_dir)
+    provider.chunk_size = 3
+    chunks = list(fetch_in_chunks(provider, ['AAA', 'BBB', 'CCC', 'DDD', 'EEE'], START, END))
+
+    assert sorted(len(c) for c in chunks) == [2, 3]
+
+
+def test_yahoo_keeps_good_tickers_when_one_raises(monkeypatch):
+    dates = pd.bdate_range(START, periods=5, tz='America/New_York')
+    bars = pd.DataFrame({'Open': 1.0, 'Close': 2.0, 'Adj Close': 2.0, 'Volume': 100.0}, index=dates)
+
+    class FakeTicker:
+        def __init__(self, ticker):
+            self.ticker = ticker
+
+        def history(self, **kwargs):
+            if self.ticker == 'BAD':
+                raise ConnectionError("rate limited")
+            return bars.copy()
+
+    monkeypatch.setitem(sys.modules, 'yfinance', types.SimpleNamespace(Ticker=FakeTicker))
+    frames = YahooProvider().fetch(['AAA', 'BAD', 'BBB'], START, END)
+
+    assert sorted(frames) == ['AAA', 'BBB']
+    assert list(frames['AAA'].columns) == ['Close', 'Adj Close', 'Volume']
+    assert frames['AAA'].index.tz is None
+
+
+def test_save_market_chunk_is_idempotent(fixture_dir, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'quant.db'}")
+    Base.metadata.create_all(engine)
+    frames = LocalFileProvider(fixture_dir).fetch(['AAA', 'BBB'], START, END)
+
+    with Session(engine) as session:
+        save_market_chunk(session, frames)
+        save_market_chunk(session, frames)
+
+        assert session.query(Company).count() == 2
+        assert session.query(MarketData).count() == 40
@@ -0,0 +1,167 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtester import run_strategy
+from src.portfolio import build_portfolio, cost_sweep, pivot_panel
+
+
+def make_panel(n_companies=12, n_days=150, gap_every=None, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2020-01-01', periods=n_days)
+    rows = []
+    for company_id in range(1, n_companies + 1):
+        prices = 100 * np.cumprod(1 + rng.normal(0, 0.01, n_days))
+        for i, (date, price) in enumerate(zip(dates, prices)):
+            # First company misses every gap_every-th date
+            if gap_every and company_id == 1 and i % gap_every == 3:
+                continue
+            rows.append({'company_id': company_id, 'date': date, 'close': price,
+                         'volume': float(rng.integers(1000, 100000)),
+                         'wsi_composite': rng.normal()})
+    return pd.DataFrame(rows).sort_values(['company_id', 'date'])
+
+
+def old_run_strategy(df, quantile, smoothing):
+    """Per-day loop the vectorized engine replaced."""
+    df = df.copy()
+    df['return'] = df.groupby('company_id')['close'].pct_change()
+    if smoothing > 1:
+        df['wsi_composite'] = df.groupby('company_id')['wsi_composite'].transform(
+            lambda x: x.rolling(window=smoothing).mean())
+    df['signal_lagged'] = df.groupby('company_id')['wsi_composite'].shift(1)
+    df = df.dropna()
+
+    out = []
+    for d in np.sort(df['date'].unique()):
+        day_df = df[df['date'] == d].sort_values('signal_lagged')
+        if len(day_df) < 2:
+            continue
+        k = max(1, int(len(day_df) * quantile))
+        strat = 0.5 * day_df.iloc[:k]['return'].mean() - 0.5 * day_df.iloc[-k:]['return'].mean()
+        out.append({'date': d, 'strategy': strat, 'market': day_df['return'].mean()})
+    return pd.DataFrame(out).set_index('date')
+
+
+@pytest.mark.parametrize('gap_every', [None, 7])
+@pytest.mark.parametrize('quantile,smoothing', [(0.3, 1), (0.4, 3), (0.1, 5)])
+def test_daily_matches_old_loop(gap_every, quantile, smoothing):
+    df = make_panel(gap_every=gap_every)
+    expected = old_run_strategy(df, quantile, smoothing)
+    result = run_strategy(df, quantile=quantile, smoothing=smoothing)['df']
+
+    assert list(result.index) == list(expected.index)
+    np.testing.assert_allclose(result['strategy'], expected['strategy'], atol=1e-12)
+    np.testing.assert_allclose(result['market'], expected['market'], atol=1e-12)
+
+
+def test_max_weight_caps_positions():
+    df = make_panel()
+    weights = build_portfolio(df, quantile=0.1, max_weight=0.2)['weights']
+
+    assert weights.abs().to_numpy().max() <= 0.2 + 1e-12
+    assert weights.abs().to_numpy().max() == pytest.approx(0.2)
+
+
+def test_max_participation_caps_by_dollar_volume():
+    df = make_panel()
+    capital = 1e9
+    panel = pivot_panel(df)
+    weights = build_portfolio(df, quantile=0.3, max_participation=0.1, capital=capital)['weights']
+
+    limit = (0.1 * panel['dollar_adv'] / capital).fillna(0)
+    assert (weights.abs() <= limit + 1e-12).all().all()
+    assert weights.abs().to_numpy().max() > 0
+
+
+@pytest.mark.parametrize('rebalance,freq', [('weekly', 'W'), ('monthly', 'M')])
+def test_held_weights_drift_between_rebalances(rebalance, freq):
+    df = make_panel(gap_every=7)
+    portfolio = build_portfolio(df, quantile=0.3, rebalance=rebalance)
+    weights = portfolio['weights'].to_numpy()
+    results_df = portfolio['df']
+    returns = pivot_panel(df)['returns'].fillna(0).to_numpy()
+
+    periods = results_df.index.to_period(freq)
+    is_rebalance = np.r_[True, periods[1:] != periods[:-1]]
+
+    # Trades only on the first day of each window
+    assert (results_df['turnover'].to_numpy()[~is_rebalance] == 0).all()
+    assert (results_df['turnover'].to_numpy()[is_rebalance] > 0).all()
+
+    # Reference: step the book through each day
+    gross = results_df['gross'].to_numpy()
+    for t in np.flatnonzero(~is_rebalance):
+        drifted = weights[t - 1] * (1 + returns[t - 1]) / (1 + gross[t - 1])
+        np.testing.assert_allclose(weights[t], drifted, atol=1e-12)
+    np.testing.assert_allclose(gross, (weights * returns).sum(axis=1), atol=1e-12)
+
+
+def test_daily_turnover_is_measured_from_drifted_weights():
+    df = make_panel()
+    portfolio = build_portfolio(df, quantile=0.3)
+    weights = portfolio['weights'].to_numpy()
+    returns = pivot_panel(df)['returns'].fillna(0).to_numpy()
+    gross = portfolio['df']['gross'].to_numpy()
+
+    drifted = weights[:-1] * (1 + returns[:-1]) / (1 + gross[:-1, None])
+    expected = np.abs(weights[1:] - drifted).sum(axis=1)
+    np.testing.assert_allclose(portfolio['df']['turnover'].to_numpy()[1:], expected, atol=1e-12)
+
+
+def test_unknown_rebalance_raises():
+    with pytest.raises(ValueError):
+        build_portfolio(make_panel(), rebalance='hourly')
+
+
+@pytest.mark.parametrize('rebalance', ['daily', 'weekly'])
+def test_cost_sweep_matches_run_strategy(rebalance):
+    df = make_panel(gap_every=7)
+    costs = [0.0, 5.0, 25.0]
+    sweep = cost_sweep(build_portfolio(df, quantile=0.3, smoothing=3, rebalance=rebalance), costs)
+
+    for _, row in sweep.iterrows():
+        res = run_strategy(df, quantile=0.3, smoothing=3, rebalance=rebalance, cost_bps=row['cost_bps'])
+        assert row['sharpe'] == pytest.approx(res['sharpe'])
+        assert row['return'] == pytest.approx(res['return'])
+        assert row['volatility'] == pytest.approx(res['volatility'])
+        assert row['max_drawdown'] == pytest.approx(res['max_drawdown'])
+        assert row['turnover'] == pytest.approx(res['turnover'])
+
+
+@pytest.mark.parametrize('rebalance', ['daily', 'monthly'])
+def test_empty_input_gives_zero_metrics(rebalance):
+    df = make_panel().iloc[0:0]
+    res = run_strategy(df, rebalance=rebalance, cost_bps=10)
+
+    assert res['sharpe'] == 0
+    assert res['return'] == 0
+    assert res['df'].empty
+    assert (cost_sweep(res['portfolio'], [0.0, 10.0])['sharpe'] == 0).all()
+
+
+def test_total_loss_does_not_poison_later_days():
+    df = make_panel()
+    # Company 2 goes to zero mid-sample and stays there
+    dates = np.sort(df['date'].unique())
+    wiped = (df['company_id'] == 2) & (df['date'] >= dates[40])
+    df.loc[wiped, 'close'] = 0.0
+
+    portfolio = build_portfolio(df, quantile=0.3, rebalance='monthly')
+
+    assert np.isfinite(portfolio['weights'].to_numpy()).all()
+    assert np.isfinite(portfolio['df'][['gross', 'turnover']].to_numpy()).all()
+
+
+def test_precomputed_panel_must_match_arguments():
+    df = make_panel()
+    panel = pivot_panel(df, smoothing=3)
+
+    shared = build_portfolio(df, quantile=0.3, smoothing=3, panel=panel)['df']
+    fresh = build_portfolio(df, quantile=0.3, smoothing=3)['df']
+    pd.testing.assert_frame_equal(shared, fresh)
+
+    with pytest.raises(ValueError, match="smoothing"):
+        build_portfolio(df, smoothing=5, panel=panel)
+    with pytest.raises(ValueError, match="adv_window"):
+        build_portfolio(df, smoothing=3, adv_window=60, panel=panel)
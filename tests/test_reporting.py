@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.portfolio import ANNUAL_FACTOR
+from src.reporting import (lttb, downsample, drawdown, rolling_sharpe,
+                           write_backtest_report, write_sweep_heatmap)
+
+
+def make_returns(n_days, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range('1990-01-01', periods=n_days)
+    return pd.DataFrame({'strategy': rng.normal(0.0003, 0.01, n_days),
+                         'market': rng.normal(0.0002, 0.01, n_days)}, index=index)
+
+
+@pytest.mark.parametrize('n,threshold', [(10, 3), (100, 7), (1000, 37), (5000, 2000), (2001, 2000)])
+def test_lttb_keeps_endpoints_and_threshold_points(n, threshold):
+    rng = np.random.default_rng(n)
+    idx = lttb(np.arange(n), rng.normal(size=n).cumsum(), threshold)
+
+    assert len(idx) == threshold
+    assert idx[0] == 0
+    assert idx[-1] == n - 1
+    assert (np.diff(idx) > 0).all()
+
+
+@pytest.mark.parametrize('threshold', [50, 100, 2, 0])
+def test_lttb_returns_all_points_when_not_reducing(threshold):
+    y = np.arange(50.0)
+    np.testing.assert_array_equal(lttb(np.arange(50), y, threshold), np.arange(50))
+
+
+def test_downsample_drops_nans_and_keeps_spike():
+    index = pd.bdate_range('2000-01-01', periods=10000)
+    series = pd.Series(np.zeros(10000), index=index)
+    series.iloc[::97] = np.nan
+    series.iloc[4321] = 50.0
+
+    result = downsample(series, max_points=500)
+
+    assert len(result) == 500
+    assert result.notna().all()
+    assert result.index.is_monotonic_increasing
+    assert result.max() == 50.0
+    assert result.idxmax() == index[4321]
+
+
+def test_downsample_leaves_short_series_alone():
+    series = pd.Series([1.0, np.nan, 3.0], index=pd.bdate_range('2000-01-01', periods=3))
+    result = downsample(series, max_points=10)
+
+    assert list(result) == [1.0, 3.0]
+
+
+def test_drawdown_matches_reference():
+    returns = make_returns(300)['strategy']
+    expected = []
+    wealth, peak = 1.0, 1.0
+    for r in returns:
+        wealth *= 1 + r
+        peak = max(peak, wealth)
+        expected.append(wealth / peak - 1)
+
+    np.testing.assert_allclose(drawdown(returns), expected)
+    assert drawdown(returns).max() <= 0
+
+
+def test_rolling_sharpe_matches_reference():
+    returns = make_returns(200)['strategy']
+    window = 20
+    result = rolling_sharpe(returns, window)
+
+    assert result.iloc[:window - 1].isna().all()
+    for t in range(window - 1, len(returns)):
+        chunk = returns.iloc[t - window + 1:t + 1].to_numpy()
+        expected = chunk.mean() / chunk.std(ddof=1) * np.sqrt(ANNUAL_FACTOR)
+        assert result.iloc[t] == pytest.approx(expected)
+
+
+def test_rolling_sharpe_flat_window_is_nan():
+    returns = pd.Series(np.zeros(10), index=pd.bdate_range('2000-01-01', periods=10))
+    assert rolling_sharpe(returns, 5).isna().all()
+
+
+def test_backtest_report_size_is_flat_in_series_length(tmp_path):
+    pytest.importorskip('plotly')
+    sizes = []
+    for n_days in [5000, 20000]:
+        path = tmp_path / f"report_{n_days}.html"
+        write_backtest_report(make_returns(n_days), str(path), max_points=500)
+        sizes.append(path.stat().st_size)
+
+    assert sizes[1] < sizes[0] * 1.1
+
+
+def test_backtest_report_creates_directory(tmp_path):
+    pytest.importorskip('plotly')
+    path = tmp_path / "nested" / "report.html"
+    write_backtest_report(make_returns(100), str(path))
+
+    assert path.exists()
+
+
+def sweep_results():
+    rows = []
+    for q in [0.1, 0.3]:
+        for s in [1, 3]:
+            for rb in ['daily', 'weekly']:
+                for cost in [0.0, 10.0]:
+                    rows.append({'quantile': q, 'smoothing': s, 'rebalance': rb,
+                                 'cost_bps': cost, 'sharpe': q * s - cost / 100})
+    return pd.DataFrame(rows)
+
+
+def test_sweep_heatmap_written(tmp_path):
+    pytest.importorskip('plotly')
+    path = tmp_path / "sweep.html"
+    write_sweep_heatmap(sweep_results(), str(path), cost_bps=10.0)
+
+    assert path.exists()
+    assert path.stat().st_size > 0
+
+
+def test_sweep_heatmap_missing_cost_level(tmp_path):
+    pytest.importorskip('plotly')
+    with pytest.raises(ValueError, match="cost_bps=15"):
+        write_sweep_heatmap(sweep_results(), str(tmp_path / "sweep.html"), cost_bps=15.0)